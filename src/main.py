@@ -1,6 +1,151 @@
 # main.py
-def main():
-    print("Hello from main.py!")
+import argparse
+import sys
+
+# ⚠️ Keep this module's top-level imports to the standard library. Heavy dependencies
+# (selenium, bs4, moviepy, pandas...) are imported inside the subcommand that needs them,
+# so cron-driven Reddit-only runs don't pay for them. test_cli.py guards the startup budget.
+
+def scrape_reddit(args):
+    """Runs the Reddit web scraper."""
+    from scraper import ScraperEngine
+
+    scraper = ScraperEngine()
+    if args.subreddits:
+        scraper.subreddits = args.subreddits
+    posts = scraper.scrape_reddit_web(limit=args.limit)
+    for post in posts:
+        print(f"[{post['Subreddit']}] {post['Title']} ({post['Upvotes']} upvotes, {post['Comments']} comments)")
+    return posts
+
+def scrape_tiktok(args):
+    """Runs the TikTok scraper for a single user."""
+    from tiktok_scraper import TikTokScraper
+
+    scraper = TikTokScraper(username=args.username)
+    return scraper.scrape_user_videos(limit=args.limit)
+
+def read_cost_log(log_file):
+    """Reads cost log rows as (task, cost) pairs, returning them with the line numbers it couldn't parse.
+
+    The log has been written in three layouts over time: legacy Task,Cost,Remaining Budget rows,
+    then rows with a leading Date, and now Date,Task,Cost,Remaining Budget,Warnings.
+    """
+    import csv
+    import datetime
+
+    entries = []
+    unparsed = []
+    with open(log_file, mode='r', newline='', encoding="utf-8") as file:
+        for line_number, row in enumerate(csv.reader(file), start=1):
+            if not row or "Task" in row[:2]:
+                continue  # Blank line or a header row
+
+            try:
+                datetime.date.fromisoformat(row[0])
+                fields = row[1:]
+            except ValueError:
+                fields = row  # Legacy row without a Date column
+
+            if len(fields) < 2:
+                unparsed.append(line_number)
+                continue
+
+            task, cost = fields[0], fields[1].strip()
+            if task == "Mid-Month Top-Up" or cost.startswith("+"):
+                continue  # Top-ups add budget, they aren't spend
+            try:
+                entries.append((task, float(cost)))
+            except ValueError:
+                unparsed.append(line_number)
+    return entries, unparsed
+
+def costs(args):
+    """Prints the remaining budget and spend per task from the cost log."""
+    import os
+
+    # ✅ Read the files directly: constructing CostController can top up the budget on the 15th.
+    # Paths match CostController's defaults, relative to the working directory.
+    log_file = os.path.join("data", "cost_log.csv")
+    budget_file = os.path.join("data", "budget.txt")
+
+    if not os.path.exists(log_file):
+        print(f"⚠️ No cost log found at {log_file}.")
+    else:
+        entries, unparsed = read_cost_log(log_file)
+        spend = {}
+        for task, cost in entries:
+            count, total = spend.get(task, (0, 0.0))
+            spend[task] = (count + 1, total + cost)
+
+        for task, (count, total) in sorted(spend.items()):
+            print(f"{task}: {count} calls, £{total:.3f}")
+        if unparsed:
+            print(f"⚠️ Could not parse {len(unparsed)} rows in {log_file} (lines {', '.join(map(str, unparsed))})")
+
+    if not os.path.exists(budget_file):
+        print(f"⚠️ No budget file found at {budget_file}.")
+        return
+
+    with open(budget_file, 'r') as file:
+        contents = file.read().strip()
+    try:
+        print(f"Remaining monthly budget: £{float(contents):.2f}")
+    except ValueError:
+        print(f"⚠️ Could not parse the budget in {budget_file} ({contents!r})")
+
+def pipeline(args):
+    """Scrapes Reddit, generates narration scripts and renders videos."""
+    posts = scrape_reddit(args)
+    if not posts:
+        print("⚠️ No new posts scraped. Nothing to generate.")
+        return
+
+    from script_generator import ScriptGenerator
+
+    generator = ScriptGenerator(batch_size=args.batch_size, max_concurrency=args.concurrency)
+    scripts = generator.generate_scripts(posts)
+    if args.skip_render or not scripts:
+        return
+
+    from video_renderer import VideoRenderer
+
+    renderer = VideoRenderer(workers=args.workers, background=args.background)
+    renderer.render_videos(scripts)
+
+def build_parser():
+    """Builds the argument parser for all subcommands."""
+    parser = argparse.ArgumentParser(prog="main.py", description="Reddit style content pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reddit_parser = subparsers.add_parser("scrape-reddit", help="Scrape trending Reddit posts")
+    reddit_parser.add_argument("--limit", type=int, default=10, help="Maximum number of unique posts")
+    reddit_parser.add_argument("--subreddits", nargs="+", help="Subreddits to scrape instead of the defaults")
+    reddit_parser.set_defaults(func=scrape_reddit)
+
+    tiktok_parser = subparsers.add_parser("scrape-tiktok", help="Scrape videos from a TikTok user")
+    tiktok_parser.add_argument("--username", default="scalingstories", help="TikTok username to scrape")
+    tiktok_parser.add_argument("--limit", type=int, default=5, help="Maximum number of videos")
+    tiktok_parser.set_defaults(func=scrape_tiktok)
+
+    costs_parser = subparsers.add_parser("costs", help="Show remaining budget and spend per task")
+    costs_parser.set_defaults(func=costs)
+
+    pipeline_parser = subparsers.add_parser("pipeline", help="Scrape, generate scripts and render videos")
+    pipeline_parser.add_argument("--limit", type=int, default=10, help="Maximum number of unique posts")
+    pipeline_parser.add_argument("--subreddits", nargs="+", help="Subreddits to scrape instead of the defaults")
+    pipeline_parser.add_argument("--batch-size", type=int, default=8, help="Prompts per LLM request")
+    pipeline_parser.add_argument("--concurrency", type=int, default=4, help="Concurrent LLM requests")
+    pipeline_parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    pipeline_parser.add_argument("--background", default=None, help="Background video looped under each render")
+    pipeline_parser.add_argument("--skip-render", action="store_true", help="Stop after generating scripts")
+    pipeline_parser.set_defaults(func=pipeline)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
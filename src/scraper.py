@@ -4,14 +4,48 @@ import csv
 import os
 import datetime
 import time
+import random
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 from requests.exceptions import RequestException
 
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, cooldown=60.0):
+        """Tracks consecutive failures for one host and pauses fetching while it is throttling us."""
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+
+    def remaining(self):
+        """Returns how many seconds the circuit stays open (0 when requests may go through)."""
+        return max(0.0, self.open_until - time.monotonic())
+
+    def record_success(self):
+        """Closes the circuit after a successful request."""
+        self.failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, retry_after=None):
+        """Counts a failure; opens the circuit on throttling or after too many failures in a row."""
+        self.failures += 1
+        if retry_after is not None:
+            self.open_until = max(self.open_until, time.monotonic() + retry_after)
+        elif self.failures >= self.failure_threshold:
+            self.open_until = max(self.open_until, time.monotonic() + self.cooldown)
+
 class ScraperEngine:
     def __init__(self):
         """Initializes the scraper engine for web scraping mode."""
         self.data_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "scraped_data.csv")
         self.subreddits = ["AskReddit", "nosleep", "AmItheAsshole"]  # List of subreddits
         self.existing_urls = self.load_existing_urls()  # ✅ Load already scraped URLs
+        self.max_attempts = 4  # Attempts per subreddit before giving up on it
+        self.backoff_base = 2.0  # Seconds; doubled on every retry
+        self.backoff_cap = 60.0
+        self.max_circuit_wait = 300.0  # Longest we'll pause for a throttled host before skipping
+        self.breakers = {}  # ✅ One circuit breaker per host
+        self.failed_subreddits = []
 
         # ✅ Ensure the 'data/' directory exists
         data_directory = os.path.dirname(self.data_file)
@@ -39,6 +73,7 @@ class ScraperEngine:
     def scrape_reddit_web(self, limit=10):
         """Scrapes Reddit's website for trending posts, avoiding duplicates."""
         all_posts = []
+        self.failed_subreddits = []
         scraped_urls = set()  # ✅ Track URLs within this session
         base_url = "https://old.reddit.com/r/{}/top/?t=day"
 
@@ -47,107 +82,192 @@ class ScraperEngine:
         }
 
         for subreddit_name in self.subreddits:
+            # ✅ Stop once we have enough posts; more fetches could mean retries and circuit waits
+            if len(all_posts) >= limit:
+                break
+
             print(f"Web scraping r/{subreddit_name}...")
             if not subreddit_name.isalnum():
                 print(f"❌ Invalid subreddit name: {subreddit_name}. Skipping...")
                 continue
 
-            attempts = 3  # Retry up to 3 times
-            for i in range(attempts):
-                try:
-                    response = requests.get(base_url.format(subreddit_name), headers=headers, timeout=10)
-                    response.raise_for_status()  # Raise error for bad status codes (4xx, 5xx)
-                    break  # Exit retry loop if successful
-                except requests.exceptions.SSLError:
-                    print(f"❌ SSL Error on r/{subreddit_name}, retrying... ({i+1}/{attempts})")
-                    time.sleep(2)  # Wait before retrying
-                except requests.exceptions.RequestException as e:
-                    print(f"❌ Failed to fetch r/{subreddit_name} (Error: {e})")
-                    return []  # Stop retrying on non-SSL errors
+            url = base_url.format(subreddit_name)
+            response = self.fetch(url, headers)
+            if response is None:
+                self.failed_subreddits.append(subreddit_name)
+                continue
 
             # ✅ Process HTML after a successful request
             time.sleep(2)  # Delay to avoid bot detection
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # ✅ Check for CAPTCHA
-            if soup.find("div", class_="g-recaptcha"):
-                print(f"❌ CAPTCHA detected for r/{subreddit_name}. Skipping...")
+            try:
+                posts = self.parse_subreddit(subreddit_name, response.text, limit, len(all_posts), scraped_urls)
+            except Exception as e:
+                # ✅ A broken page only costs this subreddit, not the posts already collected
+                print(f"❌ Failed to parse r/{subreddit_name} (Error: {e})")
+                self.failed_subreddits.append(subreddit_name)
                 continue
 
-            posts = soup.find_all("div", class_="thing", limit=limit * 2)  # Increase limit to find more unique posts
-
-            if not posts:
-                print(f"❌ No posts found for r/{subreddit_name}.")
+            if posts is None:
+                # ✅ A CAPTCHA means we're being throttled, so it counts against the host's breaker
+                print(f"❌ CAPTCHA detected for r/{subreddit_name}. Skipping...")
+                self.breakers[urlparse(url).netloc].record_failure()
+                self.failed_subreddits.append(subreddit_name)
                 continue
 
-            found_unique = False  # ✅ Track if we find at least one new post
+            all_posts.extend(posts)
+            scraped_urls.update(post["URL"] for post in posts)
 
-            for post in posts:
-                title_element = post.find("a", class_="title")
-                title = title_element.text.strip() if title_element else "N/A"
-
-                # 🛑 Skip posts with promotional words
-                spam_keywords = ["crypto", "advertisement", "promote", "sponsored"]
-                if any(word in title.lower() for word in spam_keywords):
-                    print(f"🚨 Skipping possible ad/spam post: {title}")
-                    continue
-
-                url_element = post.find("a", class_="title")
-                url = url_element["href"] if url_element else "N/A"
-                if url.startswith('/'):
-                    url = f"https://old.reddit.com{url}"
-                elif not url.startswith('http'):
-                    url = f"https://old.reddit.com{url}"
-
-                # ✅ Skip duplicate posts already in CSV or scraped in this session
-                if url in self.existing_urls or url in scraped_urls:
-                    print(f"⚠️ Skipping duplicate post: {title}")
-                    continue  # ✅ Skip duplicate, but keep checking for new ones
-
-                # ✅ If we find a unique post, mark it
-                found_unique = True
-
-                upvotes_element = post.find("div", class_="score unvoted") or post.find("div", class_="score likes") or post.find("div", class_="score dislikes")
-                upvotes = upvotes_element.text if upvotes_element else "0"
+        self.save_data(all_posts)
 
-                try:
-                    upvotes = self.convert_upvotes(upvotes)
-                except ValueError:
-                    upvotes = 0
+        # ✅ NEW: Show total posts scraped
+        print(f"✅ Total unique posts scraped: {len(all_posts)}")
+        if self.failed_subreddits:
+            print(f"❌ Failed subreddits: {', '.join(self.failed_subreddits)}")
+            main_path = os.path.relpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"))
+            print(f"🔁 Retry with: python {main_path} scrape-reddit --subreddits {' '.join(self.failed_subreddits)}")
 
-                comments_element = post.find("a", text=lambda text: text and "comments" in text)
-                comments = comments_element.text.split()[0] if comments_element else "0"
+        return all_posts
 
-                try:
-                    comments = int(comments.replace('k', '000').replace('.', '').replace(',', ''))
-                except ValueError:
-                    comments = 0
+    def parse_subreddit(self, subreddit_name, html, limit, collected, scraped_urls):
+        """Parses one subreddit page into new posts. Returns None if Reddit served a CAPTCHA."""
+        soup = BeautifulSoup(html, "html.parser")
 
-                post_data = {
-                    "Date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "Subreddit": subreddit_name,
-                    "Title": title,
-                    "Upvotes": upvotes,
-                    "Comments": comments,
-                    "URL": url
-                }
+        # ✅ Check for CAPTCHA
+        if soup.find("div", class_="g-recaptcha"):
+            return None
 
-                all_posts.append(post_data)
-                scraped_urls.add(url)  # ✅ Track URL in this session
+        posts = soup.find_all("div", class_="thing", limit=limit * 2)  # Increase limit to find more unique posts
 
-                # ✅ Stop early if we reach the unique post limit
-                if len(all_posts) >= limit:
-                    break
+        if not posts:
+            print(f"❌ No posts found for r/{subreddit_name}.")
+            return []
 
-            if not found_unique:
-                print(f"⚠️ All posts in r/{subreddit_name} were duplicates. Moving on...")
+        subreddit_posts = []
+        subreddit_urls = set()
+        found_unique = False  # ✅ Track if we find at least one new post
 
-        self.save_data(all_posts)
+        for post in posts:
+            title_element = post.find("a", class_="title")
+            title = title_element.text.strip() if title_element else "N/A"
 
-        # ✅ NEW: Show total posts scraped
-        print(f"✅ Total unique posts scraped: {len(all_posts)}")
+            # 🛑 Skip posts with promotional words
+            spam_keywords = ["crypto", "advertisement", "promote", "sponsored"]
+            if any(word in title.lower() for word in spam_keywords):
+                print(f"🚨 Skipping possible ad/spam post: {title}")
+                continue
 
-        return all_posts
+            url_element = post.find("a", class_="title")
+            url = url_element["href"] if url_element else "N/A"
+            if url.startswith('/'):
+                url = f"https://old.reddit.com{url}"
+            elif not url.startswith('http'):
+                url = f"https://old.reddit.com{url}"
+
+            # ✅ Skip duplicate posts already in CSV or scraped in this session
+            if url in self.existing_urls or url in scraped_urls or url in subreddit_urls:
+                print(f"⚠️ Skipping duplicate post: {title}")
+                continue  # ✅ Skip duplicate, but keep checking for new ones
+
+            # ✅ If we find a unique post, mark it
+            found_unique = True
+
+            upvotes_element = post.find("div", class_="score unvoted") or post.find("div", class_="score likes") or post.find("div", class_="score dislikes")
+            upvotes = upvotes_element.text if upvotes_element else "0"
+
+            try:
+                upvotes = self.convert_upvotes(upvotes)
+            except ValueError:
+                upvotes = 0
+
+            comments_element = post.find("a", text=lambda text: text and "comments" in text)
+            comments = comments_element.text.split()[0] if comments_element else "0"
+
+            try:
+                comments = int(comments.replace('k', '000').replace('.', '').replace(',', ''))
+            except ValueError:
+                comments = 0
+
+            post_data = {
+                "Date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "Subreddit": subreddit_name,
+                "Title": title,
+                "Upvotes": upvotes,
+                "Comments": comments,
+                "URL": url
+            }
+
+            subreddit_posts.append(post_data)
+            subreddit_urls.add(url)  # ✅ Track URL in this session
+
+            # ✅ Stop early if we reach the unique post limit
+            if collected + len(subreddit_posts) >= limit:
+                break
+
+        if not found_unique:
+            print(f"⚠️ All posts in r/{subreddit_name} were duplicates. Moving on...")
+
+        return subreddit_posts
+
+    def backoff_delay(self, attempt):
+        """Returns an exponential backoff delay with full jitter for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def parse_retry_after(self, value):
+        """Parses a Retry-After header given either in seconds or as an HTTP date."""
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_at - datetime.datetime.now(retry_at.tzinfo)).total_seconds())
+
+    def fetch(self, url, headers):
+        """Fetches a URL with backoff and a per-host circuit breaker. Returns None if it keeps failing."""
+        host = urlparse(url).netloc
+        breaker = self.breakers.setdefault(host, CircuitBreaker())
+
+        for attempt in range(self.max_attempts):
+            # ✅ Pause while the host is throttling us, unless that would stall the run too long
+            wait = breaker.remaining()
+            if wait > self.max_circuit_wait:
+                print(f"❌ Circuit open for {host} ({wait:.0f}s left). Skipping {url}")
+                return None
+            if wait:
+                print(f"⏸️ Circuit open for {host}, pausing {wait:.0f}s...")
+                time.sleep(wait)
+
+            retry_after = None
+            try:
+                response = requests.get(url, headers=headers, timeout=10)
+                if response.status_code == 429:
+                    retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+                    # ✅ Retry-After of 0 or a past date still backs off like any other retry
+                    retry_after = max(retry_after or 0.0, self.backoff_delay(attempt))
+                    print(f"🚦 Rate limited by {host}, retry after {retry_after:.0f}s ({attempt+1}/{self.max_attempts})")
+                    breaker.record_failure(retry_after)
+                    continue
+                response.raise_for_status()  # Raise error for bad status codes (4xx, 5xx)
+                breaker.record_success()
+                return response
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code < 500:
+                    print(f"❌ Failed to fetch {url} (Error: {e})")
+                    return None  # Other 4xx errors won't fix themselves on retry
+                print(f"❌ Server error on {url}, retrying... ({attempt+1}/{self.max_attempts})")
+            except RequestException as e:
+                print(f"❌ Request error on {url} ({type(e).__name__}), retrying... ({attempt+1}/{self.max_attempts})")
+
+            breaker.record_failure()
+            if attempt + 1 < self.max_attempts:
+                time.sleep(self.backoff_delay(attempt))
+
+        print(f"❌ Giving up on {url} after {self.max_attempts} attempts")
+        return None
 
     def convert_upvotes(self, upvotes):
         """Converts upvotes to an integer."""
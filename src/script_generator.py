@@ -0,0 +1,243 @@
+import requests
+import csv
+import os
+import datetime
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.exceptions import RequestException
+from cost_controller import CostController
+
+class ScriptGenerator:
+    def __init__(self, base_url=None, model="gpt-3.5-turbo-instruct", task_type="llm_call_small",
+                 batch_size=8, max_concurrency=4, cost_controller=None, supports_batching=True,
+                 data_directory=None):
+        """Initializes the script generator that turns scraped posts into narration scripts."""
+        self.base_url = (base_url or os.environ.get("LLM_BASE_URL", "https://api.openai.com")).rstrip("/")
+        self.api_key = os.environ.get("OPENAI_API_KEY", "")
+        self.model = model
+        self.task_type = task_type  # ✅ Price bucket in CostController.estimate_cost
+        self.batch_size = batch_size if supports_batching else 1
+        self.max_concurrency = max_concurrency
+        self.cost_controller = cost_controller or CostController()
+
+        data_directory = data_directory or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+        self.cache_file = os.path.join(data_directory, "script_cache.csv")
+        self.data_file = os.path.join(data_directory, "scripts.csv")
+
+        # ✅ CostController and the cache file are shared between worker threads
+        self.cost_lock = threading.Lock()
+        self.reserved_prompts = 0  # ✅ Prompts sent but not yet charged, guarded by cost_lock
+        self.cache_lock = threading.Lock()
+        self.stats = {"prompts": 0, "cache_hits": 0, "llm_calls": 0, "failed": 0, "elapsed": 0.0}
+
+        # ✅ Ensure the 'data/' directory exists
+        if not os.path.exists(data_directory):
+            os.makedirs(data_directory, exist_ok=True)
+
+        # ✅ Ensure CSV files exist with headers
+        if not os.path.exists(self.cache_file):
+            with open(self.cache_file, mode='w', newline='', encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["Hash", "Model", "Response"])
+        if not os.path.exists(self.data_file):
+            with open(self.data_file, mode='w', newline='', encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["Date", "Subreddit", "Title", "URL", "Script"])
+
+        self.cache = self.load_cache()  # ✅ Responses from previous runs, keyed by prompt hash
+
+    def load_cache(self):
+        """Loads cached LLM responses so re-runs don't pay for the same prompt twice."""
+        cache = {}
+        with open(self.cache_file, mode='r', newline='', encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)  # Skip header row
+            for row in reader:
+                if len(row) > 2:
+                    cache[row[0]] = row[2]
+        return cache
+
+    def prompt_hash(self, prompt):
+        """Returns the cache key for a prompt; the model is part of the key."""
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def build_prompt(self, post):
+        """Builds the narration prompt for a single scraped post."""
+        return (
+            f"Write a short, engaging narration script for a vertical video about this "
+            f"r/{post['Subreddit']} post. Hook the viewer in the first sentence and keep it "
+            f"under 150 words.\n\nTitle: {post['Title']}\n\nScript:"
+        )
+
+    def cache_store(self, key, response):
+        """Stores a response in memory and appends it to the persistent cache."""
+        with self.cache_lock:
+            self.cache[key] = response
+            with open(self.cache_file, mode='a', newline='', encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow([key, self.model, response])
+
+    def call_llm(self, prompts):
+        """Sends one completions request for a batch of prompts and returns the texts in order."""
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        payload = {"model": self.model, "prompt": prompts, "max_tokens": 300}
+
+        response = requests.post(f"{self.base_url}/v1/completions", json=payload, headers=headers, timeout=60)
+        response.raise_for_status()
+
+        # ✅ Choices come back with an index into the prompt list, not necessarily in order
+        texts = [None] * len(prompts)
+        for choice in response.json()["choices"]:
+            texts[choice["index"]] = choice["text"].strip()
+        return texts
+
+    def reserve_budget(self, batch):
+        """Reserves the cost of as much of the batch as the budget covers; returns the affordable part.
+
+        Reservations are tracked here rather than taken off CostController.monthly_budget, so
+        concurrent batches can't all pass the check against the same balance, while log_cost
+        and budget.txt only ever see the real balance.
+        """
+        with self.cost_lock:
+            estimate = self.cost_controller.estimate_cost(self.task_type)
+            affordable = []
+            for item in batch:
+                reserved = estimate * (self.reserved_prompts + 1)
+                # ✅ Keep a tiny margin so float rounding can't make log_cost refuse a call we already made
+                if self.cost_controller.monthly_budget - reserved < 1e-9:
+                    break
+                self.reserved_prompts += 1
+                affordable.append(item)
+
+            if len(affordable) < len(batch):
+                print(f"❌ Cannot afford {self.task_type} for {len(batch) - len(affordable)} prompts. "
+                      f"Remaining budget: £{self.cost_controller.monthly_budget:.2f}")
+                self.stats["failed"] += len(batch) - len(affordable)
+            return affordable
+
+    def release_budget(self, batch):
+        """Gives back a reservation taken by reserve_budget. Call with cost_lock held."""
+        self.reserved_prompts -= len(batch)
+
+    def run_batch(self, batch):
+        """Generates scripts for a batch of (key, prompt) pairs, logging each prompt's cost."""
+        batch = self.reserve_budget(batch)
+        if not batch:
+            return {}
+
+        try:
+            texts = self.call_llm([prompt for _, prompt in batch])
+        except (RequestException, KeyError, IndexError, ValueError) as e:
+            print(f"❌ LLM call failed for a batch of {len(batch)} prompts (Error: {e})")
+            with self.cost_lock:
+                self.release_budget(batch)  # ✅ Nothing was generated, so refund the reservation
+                self.stats["failed"] += len(batch)
+            return {}
+
+        results = {}
+        with self.cost_lock:
+            # ✅ Swap the reservation for the real, logged charge in one step
+            self.release_budget(batch)
+            self.stats["llm_calls"] += 1
+            for (key, _), text in zip(batch, texts):
+                self.cost_controller.log_cost(self.task_type)
+                if text is None:
+                    self.stats["failed"] += 1
+                    continue
+                results[key] = text
+
+        for key, text in results.items():
+            self.cache_store(key, text)
+        return results
+
+    def generate_scripts(self, posts):
+        """Generates a narration script for each post, using the cache and concurrent batched calls."""
+        start = time.perf_counter()
+        keyed_posts = []
+        pending = {}  # ✅ Unique uncached prompts, so duplicates in one run are only paid once
+
+        for post in posts:
+            prompt = self.build_prompt(post)
+            key = self.prompt_hash(prompt)
+            keyed_posts.append((key, post))
+            self.stats["prompts"] += 1
+            if key in self.cache:
+                self.stats["cache_hits"] += 1
+            elif key not in pending:
+                pending[key] = prompt
+
+        items = list(pending.items())
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        if batches:
+            print(f"🧠 Generating {len(items)} scripts in {len(batches)} batches "
+                  f"({self.max_concurrency} concurrent)...")
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                list(executor.map(self.run_batch, batches))
+
+        scripts = []
+        new_scripts = []  # ✅ Cache hits are already in scripts.csv from the run that generated them
+        for key, post in keyed_posts:
+            if key not in self.cache:
+                continue
+            script = {
+                "Date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "Subreddit": post["Subreddit"],
+                "Title": post["Title"],
+                "URL": post["URL"],
+                "Script": self.cache[key]
+            }
+            scripts.append(script)
+            if key in pending:
+                new_scripts.append(script)
+
+        self.stats["elapsed"] += time.perf_counter() - start
+        self.save_data(new_scripts)
+        self.print_summary()
+        return scripts
+
+    def hit_rate(self):
+        """Returns the fraction of prompts served from the cache."""
+        if not self.stats["prompts"]:
+            return 0.0
+        return self.stats["cache_hits"] / self.stats["prompts"]
+
+    def throughput(self):
+        """Returns prompts handled per second across all runs."""
+        if not self.stats["elapsed"]:
+            return 0.0
+        return self.stats["prompts"] / self.stats["elapsed"]
+
+    def print_summary(self):
+        """Prints throughput, cache hit rate and call counts."""
+        print(f"✅ Prompts: {self.stats['prompts']}, LLM calls: {self.stats['llm_calls']}, "
+              f"failed: {self.stats['failed']}")
+        print(f"📊 Cache hit rate: {self.hit_rate():.0%}, throughput: {self.throughput():.1f} prompts/s")
+
+    def load_posts(self, data_file=None):
+        """Loads scraped posts from the scraper's CSV."""
+        data_file = data_file or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "scraped_data.csv")
+        with open(data_file, mode='r', newline='', encoding="utf-8") as file:
+            return list(csv.DictReader(file))
+
+    def save_data(self, scripts):
+        """Saves generated scripts to a CSV file."""
+        if not scripts:
+            print("⚠️ No scripts to save. Skipping CSV write.")
+            return
+
+        try:
+            with open(self.data_file, mode='a', newline='', encoding="utf-8") as file:
+                writer = csv.writer(file)
+                for script in scripts:
+                    writer.writerow([script["Date"], script["Subreddit"], script["Title"], script["URL"], script["Script"]])
+            print("✅ Scripts saved to data/scripts.csv")
+        except IOError as e:
+            print(f"❌ Failed to save scripts to CSV (Error: {e})")
+
+    def run(self):
+        """Generates scripts for every post in the scraper's CSV."""
+        return self.generate_scripts(self.load_posts())
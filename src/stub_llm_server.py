@@ -0,0 +1,58 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """Answers /v1/completions requests with canned scripts, for offline testing."""
+
+    def do_POST(self):
+        if self.path != "/v1/completions":
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        prompts = payload.get("prompt", [])
+        if isinstance(prompts, str):
+            prompts = [prompts]
+
+        time.sleep(self.server.latency)  # ✅ Simulate network + inference latency per request
+        with self.server.lock:
+            self.server.requests_served += 1
+            self.server.prompts_served += len(prompts)
+
+        choices = [
+            {"index": i, "text": f" Stub narration script #{i} ({len(prompt)}-char prompt)."}
+            for i, prompt in enumerate(prompts)
+        ]
+        body = json.dumps({"object": "text_completion", "model": payload.get("model"), "choices": choices}).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output readable
+
+def start_stub_server(port=0, latency=0.05):
+    """Starts the stub LLM server on a background thread and returns it."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubLLMHandler)
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.requests_served = 0
+    server.prompts_served = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# ✅ Run stub server if executed directly
+if __name__ == "__main__":
+    stub = start_stub_server(port=8001)
+    print("🧪 Stub LLM server listening on http://127.0.0.1:8001 (set LLM_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stub.shutdown()
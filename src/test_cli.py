@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+# ✅ Startup budget for main.py's own imports (about 6-9 ms today), measured with `python -X importtime`
+STARTUP_BUDGET_US = 25_000
+HEAVY_MODULES = ["selenium", "webdriver_manager", "bs4", "moviepy", "pandas", "requests", "PIL", "numpy"]
+
+src_dir = os.path.dirname(os.path.abspath(__file__))
+main_path = os.path.join(src_dir, "main.py")
+
+def imported_modules(stderr):
+    """Parses `-X importtime` output into the modules the script itself imported and their total time.
+
+    Lines look like "import time: self [us] | cumulative | imported package". Interpreter bootstrap
+    and `site` (including whatever .pth files pull in) finish before the script runs, so only
+    imports logged after the top-level `site` line are counted.
+    """
+    imported = []
+    total = 0
+    after_site = False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not after_site:
+            after_site = name.strip() == "site" and not name.startswith("  ")
+            continue
+        imported.append(name.strip())
+        if not name.startswith("  "):  # Top-level imports only; their cumulative time covers the rest
+            total += int(cumulative)
+    return imported, total
+
+for command in (["--help"], ["costs", "--help"], ["scrape-reddit", "--help"], ["pipeline", "--help"]):
+    result = subprocess.run([sys.executable, "-X", "importtime", main_path, *command],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+    imported, total = imported_modules(result.stderr)
+
+    heavy = [name for name in imported if name.split(".")[0] in HEAVY_MODULES]
+    assert not heavy, f"{' '.join(command)} imported heavy dependencies: {heavy}"
+
+    print(f"main.py {' '.join(command)}: {total / 1000:.1f} ms of imports")
+    assert total < STARTUP_BUDGET_US, f"Startup imports took {total}us (budget {STARTUP_BUDGET_US}us)"
+
+print("✅ CLI startup within budget")
+
+# ✅ The scrape-reddit path must not pick up TikTok, render or pandas dependencies
+result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import scraper"],
+                        capture_output=True, text=True, cwd=src_dir)
+assert result.returncode == 0, result.stderr
+imported, _ = imported_modules(result.stderr)
+heavy = [name for name in imported if name.split(".")[0] in ["selenium", "webdriver_manager", "moviepy", "pandas"]]
+assert not heavy, f"import scraper pulled in: {heavy}"
+print("✅ scraper imports stay Reddit-only")
+
+# ✅ `costs` reads every log layout, skips top-ups and never touches the budget file
+work_dir = tempfile.mkdtemp()
+os.makedirs(os.path.join(work_dir, "data"))
+with open(os.path.join(work_dir, "data", "cost_log.csv"), "w", encoding="utf-8") as file:
+    file.write("Task,Cost,Remaining Budget\n"
+               "llm_call_small,0.01,99.99\n"
+               "2025-01-29,llm_call_small,0.01,99.98\n"
+               "2025-01-29,llm_call_medium,0.05,99.93,\n"
+               "2025-02-15,Mid-Month Top-Up,+100.0,199.93,\n"
+               "garbage\n")
+with open(os.path.join(work_dir, "data", "budget.txt"), "w") as file:
+    file.write("199.93")
+
+result = subprocess.run([sys.executable, main_path, "costs"], capture_output=True, text=True, cwd=work_dir)
+assert result.returncode == 0, result.stderr
+assert "llm_call_small: 2 calls" in result.stdout, result.stdout
+assert "llm_call_medium: 1 calls" in result.stdout, result.stdout
+assert "Top-Up" not in result.stdout, result.stdout
+assert "Could not parse 1 rows" in result.stdout, result.stdout
+with open(os.path.join(work_dir, "data", "budget.txt")) as file:
+    assert file.read() == "199.93"
+
+# ✅ A corrupt budget file is reported, not a traceback
+with open(os.path.join(work_dir, "data", "budget.txt"), "w") as file:
+    file.write("")
+result = subprocess.run([sys.executable, main_path, "costs"], capture_output=True, text=True, cwd=work_dir)
+assert result.returncode == 0, result.stderr
+assert "Could not parse the budget" in result.stdout, result.stdout
+print("✅ costs report is read-only and handles every log layout")
@@ -0,0 +1,132 @@
+import os
+import csv
+import datetime
+import tempfile
+from email.utils import format_datetime
+from unittest import mock
+import requests
+import scraper
+from scraper import CircuitBreaker, ScraperEngine
+
+class FakeResponse:
+    def __init__(self, status_code=200, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+def listing(*titles):
+    """Builds a minimal old.reddit listing page."""
+    things = "".join(
+        f'<div class="thing"><a class="title" href="/r/test/comments/{i}/">{title}</a>'
+        f'<div class="score unvoted">{i + 1}k</div><a>{i} comments</a></div>'
+        for i, title in enumerate(titles)
+    )
+    return f"<html><body>{things}</body></html>"
+
+def offline_engine(subreddits):
+    """Creates a scraper that writes to a scratch CSV instead of data/scraped_data.csv."""
+    engine = ScraperEngine()
+    engine.data_file = os.path.join(tempfile.mkdtemp(), "scraped_data.csv")
+    engine.existing_urls = set()
+    engine.subreddits = subreddits
+    return engine
+
+def saved_titles(engine):
+    with open(engine.data_file, newline='', encoding="utf-8") as file:
+        return [row[2] for row in csv.reader(file)]
+
+# ✅ Retry-After in seconds and as an HTTP date; junk is ignored
+engine = offline_engine([])
+assert engine.parse_retry_after("120") == 120.0
+retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=30)
+assert 25 <= engine.parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+assert engine.parse_retry_after("soon") is None
+assert engine.parse_retry_after(None) is None
+
+# ✅ Backoff grows exponentially with jitter and stays under the cap
+for attempt in range(10):
+    delay = engine.backoff_delay(attempt)
+    assert 0 <= delay <= min(engine.backoff_cap, engine.backoff_base * 2 ** attempt)
+
+# ✅ Breaker opens after repeated failures or on Retry-After, and closes on success
+breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+breaker.record_failure()
+breaker.record_failure()
+assert breaker.remaining() == 0
+breaker.record_failure()
+assert 59 < breaker.remaining() <= 60
+breaker.record_success()
+assert breaker.remaining() == 0
+breaker.record_failure(retry_after=10)
+assert 9 < breaker.remaining() <= 10
+
+# ✅ A circuit open longer than max_circuit_wait skips the URL without a request
+engine.breakers["old.reddit.com"] = CircuitBreaker()
+engine.breakers["old.reddit.com"].record_failure(retry_after=engine.max_circuit_wait + 60)
+with mock.patch.object(scraper.requests, "get") as get, mock.patch.object(scraper.time, "sleep"):
+    assert engine.fetch("https://old.reddit.com/r/test/top/?t=day", {}) is None
+    assert not get.called
+
+# ✅ Retry-After: 0 still backs off between attempts instead of hammering the host
+engine = offline_engine([])
+with mock.patch.object(scraper.requests, "get", return_value=FakeResponse(429, headers={"Retry-After": "0"})) as get, \
+        mock.patch.object(scraper.time, "sleep") as sleep:
+    assert engine.fetch("https://old.reddit.com/r/test/top/?t=day", {}) is None
+assert get.call_count == engine.max_attempts
+assert sleep.call_count >= engine.max_attempts - 1
+
+# ✅ Once the limit is reached, the remaining subreddits aren't fetched at all
+engine = offline_engine(["AskReddit", "nosleep", "AmItheAsshole"])
+with mock.patch.object(scraper.requests, "get", return_value=FakeResponse(200, listing("One", "Two", "Three"))) as get, \
+        mock.patch.object(scraper.time, "sleep"):
+    posts = engine.scrape_reddit_web(limit=2)
+assert [post["Title"] for post in posts] == ["One", "Two"]
+assert get.call_count == 1
+
+# ✅ ConnectionError on one subreddit, 429 on another, success on a third: the good posts are saved
+def fake_get(url, headers=None, timeout=None):
+    if "/r/AskReddit/" in url:
+        raise requests.exceptions.ConnectionError("connection reset")
+    if "/r/nosleep/" in url:
+        return FakeResponse(429, headers={"Retry-After": "120"})
+    return FakeResponse(200, listing("First good post", "Second good post"))
+
+engine = offline_engine(["AskReddit", "nosleep", "AmItheAsshole"])
+with mock.patch.object(scraper.requests, "get", side_effect=fake_get), \
+        mock.patch.object(scraper.time, "sleep") as sleep:
+    posts = engine.scrape_reddit_web(limit=10)
+
+assert [post["Title"] for post in posts] == ["First good post", "Second good post"]
+assert saved_titles(engine) == ["First good post", "Second good post"]
+assert engine.failed_subreddits == ["AskReddit", "nosleep"]
+assert any(call.args[0] >= 119 for call in sleep.call_args_list), "Retry-After was not honoured"
+
+# ✅ A CAPTCHA or a page that fails to parse only costs that subreddit, and CAPTCHAs trip the breaker
+def fake_get_blocked(url, headers=None, timeout=None):
+    if "/r/AskReddit/" in url:
+        return FakeResponse(200, '<html><div class="g-recaptcha"></div></html>')
+    return FakeResponse(200, listing("Good post after a CAPTCHA"))
+
+engine = offline_engine(["AskReddit", "nosleep", "AmItheAsshole"])
+original_parse = engine.parse_subreddit
+
+def flaky_parse(subreddit_name, *args):
+    if subreddit_name == "nosleep":
+        raise AttributeError("unexpected page layout")
+    return original_parse(subreddit_name, *args)
+
+with mock.patch.object(scraper.requests, "get", side_effect=fake_get_blocked), \
+        mock.patch.object(scraper.time, "sleep"), \
+        mock.patch.object(engine, "parse_subreddit", side_effect=flaky_parse):
+    posts = engine.scrape_reddit_web(limit=10)
+
+assert [post["Title"] for post in posts] == ["Good post after a CAPTCHA"]
+assert saved_titles(engine) == ["Good post after a CAPTCHA"]
+assert engine.failed_subreddits == ["AskReddit", "nosleep"]
+assert engine.breakers["old.reddit.com"].failures == 0  # Closed again by the later success
+
+print("✅ Offline scraper resilience checks passed")
@@ -0,0 +1,81 @@
+import os
+import csv
+import tempfile
+from stub_llm_server import start_stub_server
+from cost_controller import CostController
+from script_generator import ScriptGenerator
+
+# ✅ Run everything offline in a scratch directory (CostController writes to ./data)
+work_dir = tempfile.mkdtemp()
+os.chdir(work_dir)
+stub = start_stub_server(latency=0.05)
+base_url = f"http://127.0.0.1:{stub.server_address[1]}"
+
+def remaining_budgets(log_file):
+    """Returns the Remaining Budget column for LLM calls, in log order."""
+    with open(log_file, newline='', encoding="utf-8") as file:
+        return [float(row[3]) for row in csv.reader(file) if len(row) > 3 and row[1] == "llm_call_small"]
+
+posts = [
+    {"Subreddit": "nosleep", "Title": f"Test story number {i}", "URL": f"https://old.reddit.com/r/nosleep/comments/{i}/"}
+    for i in range(40)
+]
+
+controller = CostController(initial_budget=100.0)
+generator = ScriptGenerator(base_url=base_url, batch_size=8, max_concurrency=4,
+                            cost_controller=controller, data_directory=os.path.join(work_dir, "data"))
+
+# ✅ First run: every prompt is a cache miss
+scripts = generator.generate_scripts(posts)
+assert len(scripts) == len(posts)
+assert generator.stats["cache_hits"] == 0
+assert stub.requests_served == 5  # 40 prompts / batch_size 8
+print(f"Budget after first run: £{controller.monthly_budget:.2f}")
+
+# ✅ Concurrent batches must not leak their reservations into the logged balance
+balances = remaining_budgets(controller.log_file)
+assert len(balances) == len(posts)
+assert abs(balances[0] - 99.99) < 1e-9, balances[0]
+assert all(later < earlier for earlier, later in zip(balances, balances[1:])), balances
+
+# ✅ Second run with a fresh generator: everything comes from the persistent cache
+rerun = ScriptGenerator(base_url=base_url, cost_controller=controller, data_directory=os.path.join(work_dir, "data"))
+scripts = rerun.generate_scripts(posts)
+assert len(scripts) == len(posts)
+assert rerun.hit_rate() == 1.0
+assert stub.requests_served == 5  # No new LLM requests
+print(f"Budget after cached re-run: £{controller.monthly_budget:.2f}")
+
+# ✅ Re-runs must not append cache hits to scripts.csv again
+with open(os.path.join(work_dir, "data", "scripts.csv"), encoding="utf-8") as file:
+    assert sum(1 for _ in file) == len(posts) + 1  # Header + one row per post
+
+# ✅ Budget runs out partway through a concurrent run: never send more prompts than it covers
+budget_dir = tempfile.mkdtemp()
+os.chdir(budget_dir)
+controller = CostController(initial_budget=0.20)
+controller.monthly_budget = 0.20  # Ignore a mid-month top-up if this runs on the 15th
+covered = int(round(controller.monthly_budget / controller.estimate_cost("llm_call_small")))
+prompts_before = stub.prompts_served
+
+new_posts = [
+    {"Subreddit": "AskReddit", "Title": f"Budget test question {i}", "URL": f"https://old.reddit.com/r/AskReddit/comments/b{i}/"}
+    for i in range(32)
+]
+limited = ScriptGenerator(base_url=base_url, batch_size=8, max_concurrency=4,
+                          cost_controller=controller, data_directory=os.path.join(budget_dir, "data"))
+scripts = limited.generate_scripts(new_posts)
+served = stub.prompts_served - prompts_before
+assert 0 < served <= covered, f"{served} prompts sent but budget covers {covered}"
+assert len(scripts) == served
+
+# ✅ Every prompt that was sent is charged and logged
+with open(controller.log_file, encoding="utf-8") as file:
+    logged = sum(1 for line in file if ",llm_call_small," in line)
+assert logged == served
+assert abs(controller.monthly_budget - (0.20 - served * 0.01)) < 1e-9
+balances = remaining_budgets(controller.log_file)
+assert all(later < earlier for earlier, later in zip(balances, balances[1:])), balances
+print(f"Budget-limited run: {served}/{len(new_posts)} prompts sent, £{controller.monthly_budget:.2f} left")
+
+stub.shutdown()
@@ -0,0 +1,27 @@
+import os
+import tempfile
+from video_renderer import VideoRenderer
+
+# ✅ Small, fast renders in a scratch directory
+work_dir = tempfile.mkdtemp()
+renderer = VideoRenderer(workers=2, size=(180, 320), fps=10, data_directory=os.path.join(work_dir, "data"))
+
+# ✅ Scripts share an outro, so its caption frame should be rendered once and reused
+outro = "Follow for part two and tell us what you would have done"
+scripts = [
+    {"Title": f"Test story {i}", "URL": f"https://old.reddit.com/r/nosleep/comments/{i}/",
+     "Script": f"This is test story number {i} and it is short. {outro}"}
+    for i in range(4)
+]
+
+results = renderer.render_videos(scripts)
+assert len(results) == len(scripts)
+assert all(os.path.exists(result["Output"]) for result in results)
+assert sum(result["Cache Hits"] for result in results) > 0
+
+# ✅ Re-rendering the same scripts should be served entirely from the asset cache
+results = renderer.render_videos(scripts)
+assert all(result["Cache Misses"] == 0 for result in results)
+
+for result in results:
+    print(f"{result['Title']}: {result['Render Seconds']}s, {result['Cache Hits']} cache hits")
@@ -0,0 +1,269 @@
+import csv
+import os
+import datetime
+import hashlib
+import shutil
+import subprocess
+import textwrap
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image, ImageDraw, ImageFont
+from moviepy import AudioFileClip, ColorClip, CompositeVideoClip, ImageClip, VideoFileClip, vfx
+
+class AssetCache:
+    def __init__(self, cache_dir):
+        """Content-addressed store for intermediate render assets, shared by all workers."""
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key(self, kind, parts):
+        """Hashes everything that affects an asset's content into its cache key."""
+        digest = hashlib.sha256(kind.encode("utf-8"))
+        for part in parts:
+            digest.update(b"\0" + str(part).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_or_build(self, kind, parts, ext, build):
+        """Returns the cached asset path, calling build(path) to create it on a miss."""
+        path = os.path.join(self.cache_dir, f"{kind}-{self.key(kind, parts)}{ext}")
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        # ✅ Build under a private name and rename, so parallel workers never see half-written files
+        tmp_path = f"{path}.{os.getpid()}.tmp{ext}"
+        try:
+            build(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+def speech_engine():
+    """Returns the path of the CPU TTS engine, or None when narration falls back to silence."""
+    return shutil.which("espeak-ng") or shutil.which("espeak")
+
+def synthesize_speech(text, path, voice="en", words_per_minute=170, engine=None):
+    """Renders narration audio with espeak-ng on CPU, or silence of the spoken length if it's missing."""
+    if engine:
+        subprocess.run([engine, "-v", voice, "-s", str(words_per_minute), "-w", path, text],
+                       check=True, capture_output=True)
+        return
+
+    print("⚠️ espeak-ng not found. Rendering silent narration track.")
+    sample_rate = 22050
+    duration = max(1.0, len(text.split()) / words_per_minute * 60)
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(b"\0\0" * int(sample_rate * duration))
+
+def draw_text_overlay(text, path, size, font_size=64, wrap_width=22):
+    """Draws wrapped caption text on a translucent box and saves it as a transparent PNG."""
+    try:
+        font = ImageFont.truetype("DejaVuSans-Bold.ttf", font_size)
+    except OSError:
+        font = ImageFont.load_default(size=font_size)
+
+    lines = textwrap.wrap(text, width=wrap_width) or [""]
+    line_height = int(font_size * 1.25)
+    padding = font_size // 2
+    width = size[0] - 2 * padding
+    height = line_height * len(lines) + 2 * padding
+
+    image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle([0, 0, width - 1, height - 1], radius=padding, fill=(0, 0, 0, 160))
+    for i, line in enumerate(lines):
+        draw.text((width // 2, padding + i * line_height), line, font=font, fill="white", anchor="ma")
+    image.save(path)
+
+def prepare_background(source, path, size, fps):
+    """Scales and centre-crops a background clip to the output size, without audio."""
+    clip = VideoFileClip(source).without_audio()
+    scale = max(size[0] / clip.w, size[1] / clip.h)
+    clip = clip.resized(scale).cropped(x_center=clip.w * scale / 2, y_center=clip.h * scale / 2,
+                                       width=size[0], height=size[1])
+    clip.write_videofile(path, fps=fps, codec="libx264", preset="veryfast", threads=1, audio=False, logger=None)
+    clip.close()
+
+def caption_chunks(script, words_per_chunk=8):
+    """Splits a script into short on-screen captions."""
+    words = script.split()
+    return [" ".join(words[i:i + words_per_chunk]) for i in range(0, len(words), words_per_chunk)]
+
+def render_video(job):
+    """Renders a single video; runs inside a worker process and returns its timing and cache stats."""
+    start = time.perf_counter()
+    cache = AssetCache(job["cache_dir"])
+    size, fps = job["size"], job["fps"]
+
+    # ✅ Narration audio is the master clock for the whole video. The engine is part of the key,
+    # so silent fallback tracks are replaced once espeak-ng is installed.
+    engine = speech_engine()
+    audio_path = cache.get_or_build(
+        "tts", [engine or "silent", job["voice"], job["words_per_minute"], job["script"]], ".wav",
+        lambda path: synthesize_speech(job["script"], path, voice=job["voice"],
+                                       words_per_minute=job["words_per_minute"], engine=engine))
+
+    # ✅ Close every clip even if rendering fails, so pool workers don't leak ffmpeg readers
+    audio = background = video = None
+    try:
+        audio = AudioFileClip(audio_path)
+        duration = audio.duration
+
+        if job["background"]:
+            stat = os.stat(job["background"])
+            background_path = cache.get_or_build(
+                "background", [os.path.abspath(job["background"]), stat.st_size, stat.st_mtime_ns, size, fps], ".mp4",
+                lambda path: prepare_background(job["background"], path, size, fps))
+            background = VideoFileClip(background_path).with_effects([vfx.Loop(duration=duration)])
+        else:
+            background = ColorClip(size, color=(20, 20, 24), duration=duration)
+
+        # ✅ Title card plus captions timed by word count; identical text reuses the same frame
+        layers = [background]
+        title_path = cache.get_or_build("overlay", [job["title"], size, 72], ".png",
+                                        lambda path: draw_text_overlay(job["title"], path, size, font_size=72))
+        layers.append(ImageClip(title_path).with_duration(duration).with_position(("center", size[1] // 8)))
+
+        chunks = caption_chunks(job["script"])
+        total_words = max(1, len(job["script"].split()))
+        t = 0.0
+        for chunk in chunks:
+            chunk_duration = duration * len(chunk.split()) / total_words
+            chunk_path = cache.get_or_build("overlay", [chunk, size, 64], ".png",
+                                            lambda path, chunk=chunk: draw_text_overlay(chunk, path, size))
+            layers.append(ImageClip(chunk_path).with_start(t).with_duration(chunk_duration).with_position("center"))
+            t += chunk_duration
+
+        video = CompositeVideoClip(layers, size=size).with_duration(duration).with_audio(audio)
+        # ✅ One ffmpeg thread per worker; the process pool provides the parallelism
+        video.write_videofile(job["output"], fps=fps, codec="libx264", audio_codec="aac",
+                              preset="veryfast", threads=1, logger=None)
+    finally:
+        for clip in (video, audio, background):
+            if clip is not None:
+                clip.close()
+
+    return {
+        "Title": job["title"],
+        "Output": job["output"],
+        "Render Seconds": round(time.perf_counter() - start, 2),
+        "Cache Hits": cache.hits,
+        "Cache Misses": cache.misses
+    }
+
+class VideoRenderer:
+    def __init__(self, workers=None, size=(1080, 1920), fps=30, background=None, voice="en",
+                 words_per_minute=170, data_directory=None):
+        """Initializes the render stage that turns narration scripts into videos on a CPU process pool."""
+        data_directory = data_directory or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+        self.output_dir = os.path.join(data_directory, "videos")
+        self.cache_dir = os.path.join(data_directory, "render_cache")
+        self.log_file = os.path.join(data_directory, "render_log.csv")
+        self.workers = workers or os.cpu_count() or 1
+        self.size = tuple(size)
+        self.fps = fps
+        self.background = background  # Optional background clip, looped under every video
+        self.voice = voice
+        self.words_per_minute = words_per_minute
+
+        # ✅ Ensure output and cache directories exist
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # ✅ Ensure render log exists with headers
+        if not os.path.exists(self.log_file):
+            with open(self.log_file, mode='w', newline='', encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["Date", "Title", "Output", "Render Seconds", "Cache Hits", "Cache Misses"])
+
+    def build_job(self, script):
+        """Builds the picklable job description for one script row."""
+        name = hashlib.sha256(script["URL"].encode("utf-8")).hexdigest()[:16]
+        return {
+            "title": script["Title"],
+            "script": script["Script"],
+            "output": os.path.join(self.output_dir, f"{name}.mp4"),
+            "cache_dir": self.cache_dir,
+            "size": self.size,
+            "fps": self.fps,
+            "background": self.background,
+            "voice": self.voice,
+            "words_per_minute": self.words_per_minute
+        }
+
+    def render_videos(self, scripts):
+        """Renders every script in parallel and reports per-video time and cache-hit rate."""
+        # ✅ Re-runs append to scripts.csv, so keep only the latest script per post
+        latest = {script["URL"]: script for script in scripts}
+        jobs = [self.build_job(script) for script in latest.values()]
+        if not jobs:
+            print("⚠️ No scripts to render.")
+            return []
+
+        print(f"🎬 Rendering {len(jobs)} videos on {self.workers} CPU workers...")
+        start = time.perf_counter()
+        results = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(render_video, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ Failed to render '{job['title'][:50]}' (Error: {e})")
+                    continue
+                results.append(result)
+                lookups = result["Cache Hits"] + result["Cache Misses"]
+                print(f"✅ Rendered {result['Title'][:50]}... in {result['Render Seconds']:.1f}s "
+                      f"(cache {result['Cache Hits']}/{lookups})")
+
+        self.save_log(results)
+        self.print_summary(results, time.perf_counter() - start)
+        return results
+
+    def print_summary(self, results, elapsed):
+        """Prints overall render throughput and cache-hit rate."""
+        hits = sum(result["Cache Hits"] for result in results)
+        lookups = hits + sum(result["Cache Misses"] for result in results)
+        hit_rate = hits / lookups if lookups else 0.0
+        print(f"✅ Total videos rendered: {len(results)} in {elapsed:.1f}s")
+        print(f"📊 Asset cache hit rate: {hit_rate:.0%} ({hits}/{lookups})")
+
+    def save_log(self, results):
+        """Appends per-video render stats to data/render_log.csv."""
+        if not results:
+            return
+
+        try:
+            with open(self.log_file, mode='a', newline='', encoding="utf-8") as file:
+                writer = csv.writer(file)
+                for result in results:
+                    writer.writerow([datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), result["Title"],
+                                     result["Output"], result["Render Seconds"], result["Cache Hits"],
+                                     result["Cache Misses"]])
+        except IOError as e:
+            print(f"❌ Failed to save render log (Error: {e})")
+
+    def load_scripts(self, data_file=None):
+        """Loads generated scripts from the script generator's CSV."""
+        data_file = data_file or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "scripts.csv")
+        with open(data_file, mode='r', newline='', encoding="utf-8") as file:
+            return list(csv.DictReader(file))
+
+    def run(self):
+        """Renders a video for every generated script."""
+        return self.render_videos(self.load_scripts())
+
+# ✅ Run renderer if executed directly
+if __name__ == "__main__":
+    renderer = VideoRenderer()
+    renderer.run()